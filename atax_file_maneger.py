@@ -2,16 +2,216 @@
 # -*- coding: utf-8 -*-
 
 import os
+import errno
+import re
 import sys
 import curses
 import stat
 import time
+import shutil
 import subprocess
 from pathlib import Path
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter, itemgetter
 import pwd
 import grp
 
+# جدول صلاحيات محسوب مسبقاً لكل قيم البتات التسعة الدنيا من st_mode
+_PERM_TABLE = tuple(
+    ''.join(ch if m & (1 << (8 - i)) else '-' for i, ch in enumerate('rwxrwxrwx'))
+    for m in range(512)
+)
+
+_SIZE_UNITS = ('B', 'KiB', 'MiB', 'GiB', 'TiB', 'PiB')
+
+# قالب سطر الملف بعرض أعمدة ثابت يطابق رأس القائمة
+_ROW_FMT = "{permissions:<11} {owner:<8} {group:<8} {size:<11} {modified:<19} {name}".format_map
+
+# النتائج تخزن مؤقتاً لأن استعلامات NSS قد تكون بطيئة (LDAP, SSSD)
+# lru_cache لا يخزن الاستثناءات، لذا لا تحفظ حالات الفشل المؤقتة
+@lru_cache(maxsize=1024)
+def _lookup_uid_name(uid):
+    return pwd.getpwuid(uid).pw_name
+
+@lru_cache(maxsize=1024)
+def _lookup_gid_name(gid):
+    return grp.getgrgid(gid).gr_name
+
+def _uid_name(uid):
+    """اسم المستخدم المقابل للمعرف uid"""
+    try:
+        return _lookup_uid_name(uid)
+    except:
+        return str(uid)
+
+def _gid_name(gid):
+    """اسم المجموعة المقابلة للمعرف gid"""
+    try:
+        return _lookup_gid_name(gid)
+    except:
+        return str(gid)
+
+# مفاتيح تغير التحديد فقط دون تغيير محتوى القائمة
+_NAV_KEYS = frozenset((curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE,
+                       curses.KEY_NPAGE, curses.KEY_HOME, curses.KEY_END))
+
+class FileEntry:
+    """سجل خفيف لعنصر في المجلد مع الاحتفاظ ببيانات stat من os.scandir"""
+    __slots__ = ('name', 'name_lower', 'path', 'is_dir', 'is_file', 'is_symlink', 'stat_info',
+                 'info', 'color', 'line')
+
+    def __init__(self, entry):
+        self.name = entry.name
+        self.name_lower = entry.name.lower()
+        self.path = Path(entry.path)
+        self.is_symlink = entry.is_symlink()
+        try:
+            self.stat_info = entry.stat()
+        except OSError:
+            # رابط معطوب: لا يمكن الوصول إلى الهدف
+            self.stat_info = None
+        self.is_dir = self.stat_info is not None and stat.S_ISDIR(self.stat_info.st_mode)
+        self.is_file = self.stat_info is not None and stat.S_ISREG(self.stat_info.st_mode)
+        self.info = None
+        self.color = curses.A_NORMAL
+        self.line = None
+
+# المسح المتوازي: الحد الأدنى لعدد العناصر وعدد الخيوط
+_PARALLEL_SCAN_THRESHOLD = 256
+_PARALLEL_SCAN_WORKERS = 8
+
+# أنظمة ملفات شبكية يكون فيها زمن stat مرتفعاً فيفيدها المسح المتوازي
+_NETWORK_FS_TYPES = frozenset(('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'ncpfs',
+                               'afs', 'ceph', 'glusterfs', 'fuse.sshfs'))
+
+def _is_network_fs(path):
+    """هل يقع المسار على نظام ملفات شبكي؟ (حسب /proc/mounts، لينكس فقط)"""
+    path = os.path.realpath(path)
+    best, fs_type = '', None
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # المسافات وغيرها مرمزة بالنظام الثماني مثل \040
+                mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[1])
+                inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+                if inside and len(mount_point) >= len(best):
+                    best, fs_type = mount_point, fields[2]
+    except OSError:
+        return False
+    return fs_type in _NETWORK_FS_TYPES
+
+# مفاتيح الترتيب تعتمد على بيانات stat المخزنة فقط
+_SORT_KEYS = {
+    'name': attrgetter('name_lower'),
+    'size': lambda f: f.stat_info.st_size if f.stat_info else 0,
+    'modified': lambda f: f.stat_info.st_mtime if f.stat_info else 0,
+    'type': lambda f: f.path.suffix.lower(),
+}
+
+def _sort_entries(entries, key, reverse):
+    """ترتيب العناصر بحساب مفتاح كل عنصر مرة واحدة (decorate-sort-undecorate)"""
+    keyed = [(key(e), e) for e in entries]
+    keyed.sort(key=itemgetter(0), reverse=reverse)
+    return [e for _, e in keyed]
+
+# حجم الدفعة الواحدة عند النسخ عبر sendfile
+_SENDFILE_CHUNK = 1 << 20
+
+def _sendfile_copy(src, dst):
+    """نسخ ملف عبر os.sendfile لتبقى البيانات داخل النواة، مع الحفاظ على البيانات الوصفية مثل copy2"""
+    # فتح الوجهة بـ 'wb' يفرغها، فإن كانت هي المصدر نفسه ضاعت البيانات
+    src_st = os.stat(src)
+    # قراءة FIFO أو ملف جهاز قد تتوقف للأبد أو لا تنتهي
+    if not stat.S_ISREG(src_st.st_mode):
+        raise shutil.SpecialFileError(f"`{src}` is not a regular file")
+    try:
+        dst_st = os.stat(dst)
+    except FileNotFoundError:
+        pass
+    else:
+        if (src_st.st_dev, src_st.st_ino) == (dst_st.st_dev, dst_st.st_ino):
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        in_fd = fsrc.fileno()
+        out_fd = fdst.fileno()
+        offset = 0
+        try:
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, _SENDFILE_CHUNK)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            # بعض الأنظمة لا تدعم sendfile بين ملفين عاديين
+            if offset or e.errno not in (errno.EINVAL, errno.ENOTSOCK, errno.ENOSYS):
+                raise
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+def _fast_copytree(src, dst):
+    """نسخ مجلد بشكل تعاودي باستخدام os.scandir و sendfile"""
+    # قراءة القائمة قبل إنشاء الوجهة، حتى لا تظهر الوجهة في القائمة إن كانت داخل المصدر مباشرة
+    with os.scandir(src) as it:
+        entries = list(it)
+    os.makedirs(dst)
+    
+    # مثل shutil.copytree: ينسخ كل ما يمكن ثم يرفع shutil.Error بقائمة الأخطاء
+    errors = []
+    for e in entries:
+        target = os.path.join(dst, e.name)
+        try:
+            if e.is_symlink():
+                os.symlink(os.readlink(e.path), target)
+            elif e.is_dir(follow_symlinks=False):
+                _fast_copytree(e.path, target)
+            elif e.is_file(follow_symlinks=False):
+                _sendfile_copy(e.path, target)
+            else:
+                raise shutil.SpecialFileError(f"`{e.path}` is a special file (FIFO, socket or device)")
+        except shutil.Error as err:
+            errors.extend(err.args[0])
+        except OSError as why:
+            errors.append((e.path, target, str(why)))
+    try:
+        shutil.copystat(src, dst)
+    except OSError as why:
+        errors.append((src, dst, str(why)))
+    if errors:
+        raise shutil.Error(errors)
+
+def _fast_rmtree(path):
+    """حذف مجلد بشكل تعاودي باستخدام os.scandir دون stat إضافي لكل عنصر"""
+    with os.scandir(path) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                _fast_rmtree(e.path)
+            else:
+                os.unlink(e.path)
+    os.rmdir(path)
+
+def _scan_recursive(root, query_lower, stop=None):
+    """بحث تعاودي عن الأسماء المطابقة مع الاعتماد على نوع العنصر من DirEntry"""
+    # stop دالة اختيارية تفحص عند دخول كل مجلد لإيقاف البحث مبكراً
+    if stop is not None and stop():
+        return
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return  # مجلد لا يمكن قراءته
+    with it:
+        try:
+            for e in it:
+                if query_lower in e.name.lower():
+                    yield e.path
+                if e.is_dir(follow_symlinks=False):
+                    yield from _scan_recursive(e.path, query_lower, stop)
+        except OSError:
+            return  # فشلت القراءة أثناء المرور (مثل بعض مجلدات /proc)
+
 class FileManager:
     def __init__(self, stdscr):
         self.stdscr = stdscr
@@ -19,6 +219,7 @@ class FileManager:
         self.selected_index = 0
         self.top_index = 0
         self.files = []
+        self._all_files = []  # القائمة المرتبة قبل تطبيق البحث
         self.sort_by = 'name'
         self.sort_reverse = False
         self.pane_height = 0
@@ -29,79 +230,103 @@ class FileManager:
         self.search_query = ""
         self.quit = False
         
+        # المحرر المتاح: vim، ثم nano، ثم vi (يبحث عنه مرة واحدة)
+        self._editor = next((e for e in ('vim', 'nano', 'vi') if shutil.which(e)), None)
+        
+        # خصائص الألوان، تحسب مرة واحدة بعد تهيئة الألوان في run()
+        self._attr_dir = curses.A_NORMAL
+        self._attr_lnk = curses.A_NORMAL
+        self._attr_exe = curses.A_NORMAL
+        self._attr_normal = curses.A_NORMAL
+        
     def refresh_files(self):
         """تحديث قائمة الملفات في المسار الحالي"""
         try:
-            all_files = list(self.current_path.iterdir())
-            
-            # تصفية الملفات المخفية
-            if not self.show_hidden:
-                all_files = [f for f in all_files if not f.name.startswith('.')]
-            
-            # فصل المجلدات والملفات
-            dirs = [f for f in all_files if f.is_dir()]
-            files = [f for f in all_files if not f.is_dir()]
+            # قراءة المجلد وتصفية الملفات المخفية
+            show_hidden = self.show_hidden
+            with os.scandir(self.current_path) as it:
+                entries = [e for e in it if show_hidden or e.name[0] != '.']
+            
+            # على أنظمة الملفات الشبكية (NFS, SMB) توزع استدعاءات stat على عدة خيوط،
+            # أما على الأقراص المحلية فلا فائدة منها
+            if len(entries) > _PARALLEL_SCAN_THRESHOLD and _is_network_fs(self.current_path):
+                with ThreadPoolExecutor(max_workers=_PARALLEL_SCAN_WORKERS) as pool:
+                    records = list(pool.map(FileEntry, entries))
+            else:
+                records = map(FileEntry, entries)
+            
+            # فصل المجلدات والملفات وحساب اللون في مرور واحد
+            # (ربط الدوال بمتغيرات محلية يتجنب البحث عن الخصائص في كل دورة)
+            dirs = []
+            files = []
+            add_dir = dirs.append
+            add_file = files.append
+            get_color = self.get_file_color
+            for f in records:
+                f.color = get_color(f)
+                if f.is_dir:
+                    add_dir(f)
+                else:
+                    add_file(f)
             
             # ترتيب المجلدات أولاً
-            if self.sort_by == 'name':
-                dirs.sort(key=lambda x: x.name.lower(), reverse=self.sort_reverse)
-                files.sort(key=lambda x: x.name.lower(), reverse=self.sort_reverse)
-            elif self.sort_by == 'size':
-                dirs.sort(key=lambda x: x.stat().st_size if x.exists() else 0, reverse=self.sort_reverse)
-                files.sort(key=lambda x: x.stat().st_size if x.exists() else 0, reverse=self.sort_reverse)
-            elif self.sort_by == 'modified':
-                dirs.sort(key=lambda x: x.stat().st_mtime if x.exists() else 0, reverse=self.sort_reverse)
-                files.sort(key=lambda x: x.stat().st_mtime if x.exists() else 0, reverse=self.sort_reverse)
-            elif self.sort_by == 'type':
-                dirs.sort(key=lambda x: x.suffix.lower(), reverse=self.sort_reverse)
-                files.sort(key=lambda x: x.suffix.lower(), reverse=self.sort_reverse)
-            
-            self.files = dirs + files
-            
-            # تطبيق البحث إذا كان مفعلاً
-            if self.search_mode and self.search_query:
-                self.files = [f for f in self.files 
-                            if self.search_query.lower() in f.name.lower()]
+            sort_key = _SORT_KEYS.get(self.sort_by)
+            if sort_key is not None:
+                dirs = _sort_entries(dirs, sort_key, self.sort_reverse)
+                files = _sort_entries(files, sort_key, self.sort_reverse)
+            
+            # معلومات العرض تحسب عند ظهور السطر فقط
+            self._all_files = dirs + files
             
         except PermissionError:
-            self.files = []
+            self._all_files = []
+        
+        # تطبيق البحث إذا كان مفعلاً
+        self.apply_search()
+    
+    def apply_search(self, narrow=False):
+        """تصفية القائمة حسب نص البحث دون إعادة قراءة المجلد"""
+        if not (self.search_mode and self.search_query):
+            self.files = self._all_files
+            return
+        
+        # عند إضافة حرف تكون النتائج الجديدة جزءاً من النتائج الحالية
+        source = self.files if narrow else self._all_files
+        q = self.search_query.lower()
+        self.files = [f for f in source if q in f.name_lower]
             
     def format_size(self, size):
         """تنسيق حجم الملف"""
-        for unit in ['B', 'KiB', 'MiB', 'GiB', 'TiB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} PiB"
+        # اختيار الوحدة مباشرة من عدد البتات بدل القسمة المتكررة
+        i = min((size.bit_length() - 1) // 10, 5) if size else 0
+        return f"{size / (1 << (10 * i)):.1f} {_SIZE_UNITS[i]}"
+    
+    def get_file_info(self, entry):
+        """الحصول على معلومات الملف (تحسب عند أول طلب وتخزن في السجل)"""
+        if entry.info is None:
+            entry.info = self._build_file_info(entry)
+        return entry.info
     
-    def get_file_info(self, filepath):
-        """الحصول على معلومات الملف"""
+    def get_file_line(self, entry):
+        """الحصول على سطر العرض المنسق للملف"""
+        if entry.line is None:
+            entry.line = _ROW_FMT(self.get_file_info(entry))
+        return entry.line
+    
+    def _build_file_info(self, entry):
+        """حساب معلومات الملف من بيانات stat المخزنة"""
         try:
-            stat_info = filepath.stat()
+            stat_info = entry.stat_info
             
             # الحصول على صلاحيات الملف
-            mode = stat_info.st_mode
-            permissions = ''
-            for who in "USR", "GRP", "OTH":
-                for perm in "R", "W", "X":
-                    if mode & getattr(stat, f"S_I{perm}{who}"):
-                        permissions += perm.lower()
-                    else:
-                        permissions += '-'
+            permissions = _PERM_TABLE[stat_info.st_mode & 0o777]
             
             # الحصول على المالك والمجموعة
-            try:
-                owner = pwd.getpwuid(stat_info.st_uid).pw_name
-            except:
-                owner = str(stat_info.st_uid)
-            
-            try:
-                group = grp.getgrgid(stat_info.st_gid).gr_name
-            except:
-                group = str(stat_info.st_gid)
+            owner = _uid_name(stat_info.st_uid)
+            group = _gid_name(stat_info.st_gid)
             
             # تنسيق الوقت
-            mod_time = datetime.fromtimestamp(stat_info.st_mtime).strftime('%Y-%m-%d %H:%M')
+            mod_time = time.strftime('%Y-%m-%d %H:%M', time.localtime(stat_info.st_mtime))
             
             return {
                 'size': self.format_size(stat_info.st_size),
@@ -109,7 +334,8 @@ class FileManager:
                 'owner': owner,
                 'group': group,
                 'modified': mod_time,
-                'inode': stat_info.st_ino
+                'inode': stat_info.st_ino,
+                'name': entry.name
             }
         except:
             return {
@@ -118,12 +344,24 @@ class FileManager:
                 'owner': '?',
                 'group': '?',
                 'modified': '????-??-?? ??:??',
-                'inode': '?'
+                'inode': '?',
+                'name': entry.name
             }
     
-    def draw_ui(self):
-        """رسم واجهة المستخدم"""
-        self.stdscr.clear()
+    def get_file_color(self, entry):
+        """تحديد اللون حسب نوع الملف من بيانات stat المخزنة"""
+        if entry.is_dir:
+            return self._attr_dir
+        if entry.is_symlink:
+            return self._attr_lnk
+        if entry.stat_info is not None and entry.stat_info.st_mode & 0o111:
+            return self._attr_exe
+        return self._attr_normal
+    
+    def draw_full(self):
+        """رسم واجهة المستخدم كاملة"""
+        # erase بدل clear لتجنب إعادة رسم الطرفية بالكامل
+        self.stdscr.erase()
         height, width = self.stdscr.getmaxyx()
         self.pane_height = height - 5
         
@@ -143,60 +381,79 @@ class FileManager:
         self.stdscr.addstr(2, 0, header[:width-1], curses.A_BOLD)
         
         # عرض الملفات
+        files = self.files
+        sel = self.selected_index
+        addstr = self.stdscr.addstr
+        get_line = self.get_file_line
+        reverse = curses.A_REVERSE
         start = self.top_index
-        end = min(start + self.pane_height, len(self.files))
+        end = min(start + self.pane_height, len(files))
         
-        for i in range(start, end):
-            idx = i - start
-            file = self.files[i]
-            
-            # تحضير المعلومات
-            info = self.get_file_info(file)
-            
-            # تحديد اللون حسب نوع الملف
-            color = curses.A_NORMAL
-            if file.is_dir():
-                color = curses.A_BOLD | curses.color_pair(1)  # أزرق للمجلدات
-            elif file.is_symlink():
-                color = curses.color_pair(2)  # سماوي للروابط
-            elif os.access(file, os.X_OK):
-                color = curses.color_pair(3)  # أخضر للملفات القابلة للتنفيذ
-            
-            # إذا كان الملف محدد
-            if i == self.selected_index:
-                color |= curses.A_REVERSE
-            
-            # بناء سطر المعلومات
-            line = f"{info['permissions']:11} {info['owner']:8} {info['group']:8} "
-            line += f"{info['size']:11} {info['modified']:19} {file.name}"
-            
-            # اقتصار السطر لعرضه في النافذة
-            self.stdscr.addstr(3 + idx, 0, line[:width-1], color)
+        for row, i in enumerate(range(start, end), 3):
+            file = files[i]
+            color = file.color | reverse if i == sel else file.color
+            addstr(row, 0, get_line(file)[:width-1], color)
         
         # شريط الحالة
         status_line = 3 + self.pane_height
         if status_line < height - 1:
-            # معلومات الملف المحدد
-            if self.files and 0 <= self.selected_index < len(self.files):
-                selected_file = self.files[self.selected_index]
-                info = self.get_file_info(selected_file)
-                file_type = "Directory" if selected_file.is_dir() else "File"
-                status = f"{file_type}: {selected_file.name} | Size: {info['size']} | Permissions: {info['permissions']}"
-            else:
-                status = "No files"
-            
-            # إضافة معلومات التصفية والترتيب
-            status += f" | Hidden: {'ON' if self.show_hidden else 'OFF'} | Sort: {self.sort_by}"
-            if self.sort_reverse:
-                status += " (reverse)"
-            
-            self.stdscr.addstr(status_line, 0, status[:width-1])
+            self.draw_status(width)
             
             # شريط الأوامر
             cmd_line = status_line + 1
             if cmd_line < height:
                 commands = "F1:Help | F2:Rename | F3:View | F4:Edit | F5:Copy | F6:Move | F7:New Dir | F8:Delete | F9:Sort | F10:Quit"
                 self.stdscr.addstr(cmd_line, 0, commands[:width-1], curses.A_REVERSE)
+        
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+    
+    def draw_selection_change(self, old_index, new_index):
+        """إعادة رسم السطرين المتأثرين بتغيير التحديد وشريط الحالة فقط"""
+        height, width = self.stdscr.getmaxyx()
+        for i in (old_index, new_index):
+            if self.top_index <= i < min(self.top_index + self.pane_height, len(self.files)):
+                self.draw_row(i, width)
+        if 3 + self.pane_height < height - 1:
+            self.draw_status(width)
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+    
+    def draw_row(self, i, width):
+        """رسم سطر الملف رقم i في القائمة"""
+        file = self.files[i]
+        
+        # اللون محسوب مسبقاً عند تحديث القائمة
+        color = file.color
+        
+        # إذا كان الملف محدد
+        if i == self.selected_index:
+            color |= curses.A_REVERSE
+        
+        # السطر منسق مرة واحدة، يكفي اقتصاره لعرضه في النافذة
+        line = self.get_file_line(file)
+        self.stdscr.addstr(3 + i - self.top_index, 0, line[:width-1], color)
+    
+    def draw_status(self, width):
+        """رسم شريط الحالة"""
+        status_line = 3 + self.pane_height
+        
+        # معلومات الملف المحدد
+        if self.files and 0 <= self.selected_index < len(self.files):
+            selected_file = self.files[self.selected_index]
+            info = self.get_file_info(selected_file)
+            file_type = "Directory" if selected_file.is_dir else "File"
+            status = f"{file_type}: {selected_file.name} | Size: {info['size']} | Permissions: {info['permissions']}"
+        else:
+            status = "No files"
+        
+        # إضافة معلومات التصفية والترتيب
+        status += f" | Hidden: {'ON' if self.show_hidden else 'OFF'} | Sort: {self.sort_by}"
+        if self.sort_reverse:
+            status += " (reverse)"
+        
+        self.stdscr.addstr(status_line, 0, status[:width-1])
+        self.stdscr.clrtoeol()
     
     def navigate_to_parent(self):
         """الانتقال إلى المجلد الأعلى"""
@@ -210,9 +467,9 @@ class FileManager:
         """الدخول إلى المجلد المحدد"""
         if self.files and 0 <= self.selected_index < len(self.files):
             selected = self.files[self.selected_index]
-            if selected.is_dir():
+            if selected.is_dir:
                 try:
-                    self.current_path = selected
+                    self.current_path = selected.path
                     self.selected_index = 0
                     self.top_index = 0
                     self.refresh_files()
@@ -278,16 +535,17 @@ class FileManager:
             confirm = self.get_input(f"Delete '{target.name}'? (y/N): ")
             if confirm.lower() == 'y':
                 try:
-                    if target.is_dir():
-                        import shutil
-                        shutil.rmtree(target)
+                    if target.is_dir and not target.is_symlink:
+                        _fast_rmtree(target.path)
                     else:
-                        target.unlink()
+                        target.path.unlink()
                     
-                    self.refresh_files()
                     self.show_message(f"'{target.name}' deleted successfully!")
                 except Exception as e:
                     self.show_message(f"Error deleting: {str(e)}")
+                finally:
+                    # التحديث حتى عند الفشل، فقد يكون الحذف جزئياً أو الملف محذوفاً مسبقاً
+                    self.refresh_files()
     
     def rename_file(self):
         """إعادة تسمية ملف أو مجلد"""
@@ -298,7 +556,7 @@ class FileManager:
             if new_name:
                 try:
                     new_path = self.current_path / new_name
-                    old_file.rename(new_path)
+                    old_file.path.rename(new_path)
                     self.refresh_files()
                     self.show_message(f"Renamed to '{new_name}' successfully!")
                 except Exception as e:
@@ -325,24 +583,23 @@ class FileManager:
                 dest = self.current_path / self.clipboard.name
                 
                 if self.clipboard_type == 'copy':
-                    import shutil
-                    if self.clipboard.is_dir():
-                        shutil.copytree(self.clipboard, dest)
+                    if self.clipboard.is_dir:
+                        _fast_copytree(self.clipboard.path, dest)
                     else:
-                        shutil.copy2(self.clipboard, dest)
+                        _sendfile_copy(self.clipboard.path, dest)
                     self.show_message(f"'{self.clipboard.name}' copied successfully!")
                 
                 elif self.clipboard_type == 'cut':
-                    import shutil
-                    shutil.move(self.clipboard, dest)
+                    shutil.move(self.clipboard.path, dest)
                     self.show_message(f"'{self.clipboard.name}' moved successfully!")
                     self.clipboard = None
                     self.clipboard_type = None
                 
-                self.refresh_files()
-                
             except Exception as e:
                 self.show_message(f"Error pasting: {str(e)}")
+            finally:
+                # التحديث حتى عند الفشل، فقد ينشئ اللصق الجزئي عناصر جديدة
+                self.refresh_files()
     
     def change_sort(self):
         """تغيير طريقة الترتيب"""
@@ -369,13 +626,13 @@ class FileManager:
         """عرض محتوى الملف"""
         if self.files and 0 <= self.selected_index < len(self.files):
             file = self.files[self.selected_index]
-            if file.is_file():
+            if file.is_file:
                 try:
                     # حفظ إعدادات curses مؤقتاً
                     curses.endwin()
                     
                     # استخدام less لعرض الملف
-                    subprocess.run(['less', str(file)])
+                    subprocess.run(['less', str(file.path)])
                     
                     # إعادة تهيئة curses
                     self.stdscr.clear()
@@ -387,21 +644,64 @@ class FileManager:
                     self.stdscr.clear()
                     self.stdscr.refresh()
     
+    def recursive_search(self):
+        """بحث تعاودي في المجلد الحالي وعرض النتائج في less أثناء البحث"""
+        query = self.get_input("Recursive search: ")
+        if not query:
+            return
+        try:
+            # حفظ إعدادات curses مؤقتاً
+            curses.endwin()
+            
+            # تمرير النتائج إلى less سطراً بسطر
+            pager = subprocess.Popen(['less'], stdin=subprocess.PIPE, text=True,
+                                     bufsize=1, errors='surrogateescape')
+            try:
+                found = 0
+                # يتوقف البحث إذا أغلق المستخدم less قبل انتهائه
+                pager_closed = lambda: pager.poll() is not None
+                for path in _scan_recursive(str(self.current_path), query.lower(), pager_closed):
+                    if pager_closed():
+                        break
+                    pager.stdin.write(path + '\n')
+                    found += 1
+                if not found and not pager_closed():
+                    pager.stdin.write(f"No files matching '{query}'\n")
+            except BrokenPipeError:
+                pass  # أغلق المستخدم less أثناء الكتابة
+            finally:
+                try:
+                    pager.stdin.close()
+                except BrokenPipeError:
+                    pass
+            pager.wait()
+            
+            # إعادة تهيئة curses
+            self.stdscr.clear()
+            self.stdscr.refresh()
+        except Exception as e:
+            curses.endwin()
+            print(f"Error searching: {e}")
+            input("Press Enter to continue...")
+            self.stdscr.clear()
+            self.stdscr.refresh()
+    
     def edit_file(self):
         """تحرير ملف باستخدام محرر نصي"""
         if self.files and 0 <= self.selected_index < len(self.files):
             file = self.files[self.selected_index]
-            if file.is_file():
+            if file.is_file:
+                if self._editor is None:
+                    self.show_message("No editor found (vim, nano, vi)")
+                    return
                 try:
                     # حفظ إعدادات curses مؤقتاً
                     curses.endwin()
                     
-                    # محاولة استخدام vim، ثم nano، ثم vi
-                    editors = ['vim', 'nano', 'vi']
-                    for editor in editors:
-                        if subprocess.run(['which', editor], capture_output=True).returncode == 0:
-                            subprocess.run([editor, str(file)])
-                            break
+                    subprocess.run([self._editor, str(file.path)])
+                    
+                    # قد يتغير حجم الملف أو وقت تعديله بعد التحرير
+                    self.refresh_files()
                     
                     # إعادة تهيئة curses
                     self.stdscr.clear()
@@ -442,6 +742,7 @@ class FileManager:
             "  Ctrl+H  : Toggle hidden files",
             "  Ctrl+R  : Reverse sort order",
             "  /       : Search files",
+            "  ?       : Recursive search (results in less)",
             "  Esc     : Cancel search",
             "  v       : Paste from clipboard",
             "",
@@ -467,30 +768,38 @@ class FileManager:
         curses.init_pair(2, curses.COLOR_CYAN, curses.COLOR_BLACK)    # سماوي للروابط
         curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)   # أخضر للتنفيذ
         
+        self._attr_dir = curses.A_BOLD | curses.color_pair(1)  # أزرق للمجلدات
+        self._attr_lnk = curses.color_pair(2)                  # سماوي للروابط
+        self._attr_exe = curses.color_pair(3)                  # أخضر للملفات القابلة للتنفيذ
+        self._attr_normal = curses.A_NORMAL
+        
         curses.curs_set(0)  # إخفاء المؤشر
         curses.noecho()     # عدم عرض الأحرف المكتوبة
         
         self.refresh_files()
+        self.draw_full()
         
         while not self.quit:
-            self.draw_ui()
             key = self.stdscr.getch()
+            old_selected = self.selected_index
+            old_top = self.top_index
             
             # التعامل مع ضغطات المفاتيح
             if self.search_mode:
                 if key == 27:  # ESC
                     self.search_mode = False
                     self.search_query = ""
-                    self.refresh_files()
+                    self.apply_search()
                 elif key == 10 or key == 13:  # Enter
                     self.search_mode = False
-                    self.refresh_files()
+                    self.apply_search()
                 elif key == curses.KEY_BACKSPACE or key == 127:
                     self.search_query = self.search_query[:-1]
-                    self.refresh_files()
+                    self.apply_search()
                 elif 32 <= key <= 126:  # أحرف عادية
                     self.search_query += chr(key)
-                    self.refresh_files()
+                    self.apply_search(narrow=True)
+                self.draw_full()
                 continue
             
             if key == curses.KEY_UP:
@@ -537,6 +846,9 @@ class FileManager:
                 self.search_mode = True
                 self.search_query = ""
             
+            elif key == ord('?'):  # Shift+/
+                self.recursive_search()
+            
             elif key == ord('v'):
                 self.paste_file()
             
@@ -581,8 +893,11 @@ class FileManager:
             elif key == ord('q'):  # Q للخروج
                 self.quit = True
             
-            # تحديث العرض بعد كل إجراء
-            self.refresh_files()
+            # مفاتيح التنقل التي لا تمرر القائمة تعيد رسم سطرين فقط
+            if key in _NAV_KEYS and self.top_index == old_top:
+                self.draw_selection_change(old_selected, self.selected_index)
+            else:
+                self.draw_full()
 
 def main():
     try: